@@ -1,12 +1,13 @@
 import argparse
+import hashlib
+import json
 import os
+import re
 import sys
 import shutil
 import subprocess
-import yt_dlp as ytdl
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
 import threading
+import time
 
 #!/usr/bin/env python3
 """
@@ -14,26 +15,222 @@ bili_downloader.py
 
 Simple Bilibili downloader using yt-dlp (preferred) or falling back to the yt-dlp CLI.
 Usage:
-    python bili_downloader.py <bilibili_url> [--output DIR] [--audio-only] [--cookies COOKIES_FILE]
+    python bili_downloader.py <bilibili_url> [--output DIR] [--audio-only] [--batch-file FILE]
 
 Requirements:
     pip install yt-dlp
+    pip install httpx         (optional, parallel range downloads)
+    aria2c on PATH            (optional, pipelined DASH/HLS segment downloads)
 """
 
 
 def try_import_yt_dlp():
+    # imported lazily so `--help` and the GUI start without loading yt-dlp
     try:
-        return ytdl
+        import yt_dlp
+        return yt_dlp
     except Exception:
         return None
 
-def run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=None):
-    """Run download using yt-dlp module.
+def try_import_httpx():
+    # optional: enables the parallel range downloader below
+    try:
+        import httpx
+        return httpx
+    except Exception:
+        return None
 
-    If `progress_callback` is provided it will be called as:
-        progress_callback(percent_float_or_None, speed_str, eta_str)
-    where percent_float_or_None is a float in range [0,100] or None when not available.
+# Percentage in yt-dlp's "_percent_str" (may be padded or wrapped in color codes).
+_PCT_RE = re.compile(r"(\d+(?:\.\d+)?)%")
+
+# yt-dlp output filename template, joined onto the output directory.
+OUTPUT_TEMPLATE = "%(title)s.%(ext)s"
+
+# Parallel range downloads. Bilibili's CDN throttles per connection, so each
+# range gets its own HTTP/1.1 connection to use more of the link.
+RANGE_CONNECTIONS = 8
+# HTTP/2 would multiplex all ranges over one connection: it saves a few TLS
+# handshakes per file but puts every range under a single connection's
+# throttle, so it is off by default. Needs `pip install httpx[http2]`.
+RANGE_HTTP2 = False
+# Don't give a range less than this; smaller ranges are mostly request overhead.
+MIN_RANGE_SIZE = 1024 * 1024
+RANGE_READ_SIZE = 64 * 1024
+
+# Used for DASH/HLS manifests when aria2c is on PATH.
+ARIA2C_ARGS = ["--max-connection-per-server=16", "--split=16", "--min-split-size=1M"]
+
+def _range_client():
+    import httpx
+
+    kwargs = {
+        "timeout": httpx.Timeout(30),
+        "follow_redirects": True,
+        "limits": httpx.Limits(max_connections=RANGE_CONNECTIONS),
+    }
+    try:
+        return httpx.AsyncClient(http2=RANGE_HTTP2, **kwargs)
+    except ImportError:
+        # h2 not installed (pip install httpx[http2]); stay on HTTP/1.1
+        return httpx.AsyncClient(**kwargs)
+
+async def probe_range_size(client, url, headers=None):
+    """Return Content-Length of `url` if the server accepts byte ranges, else None."""
+    resp = await client.head(url, headers=headers)
+    if resp.status_code != 200 or resp.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return None
+    size = resp.headers.get("Content-Length")
+    return int(size) if size else None
+
+def _write_at(fd, data, offset):
+    """Write all of `data` at `offset`; ranges are disjoint so no locking is needed."""
+    data = memoryview(data)
+    while data:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, data, offset)
+        else:
+            # Windows has no pwrite; seek+write is safe on our single event loop
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, data)
+        data = data[written:]
+        offset += written
+
+async def download_ranges(client, url, size, out, n=RANGE_CONNECTIONS, headers=None, progress_hook=None):
+    """Download `size` bytes from `url` into `out` using up to `n` parallel range requests.
+
+    `progress_hook` receives yt-dlp style status dicts so the regular
+    progress hook can be reused.
+    """
+    import asyncio
+
+    parts = max(2, min(n, size // MIN_RANGE_SIZE))
+    step = -(-size // parts)
+    ranges = [(lo, min(lo + step, size) - 1) for lo in range(0, size, step)]
+    downloaded = 0
+
+    async def fetch(fd, lo, hi):
+        nonlocal downloaded
+        range_headers = dict(headers or {}, Range=f"bytes={lo}-{hi}")
+        async with client.stream("GET", url, headers=range_headers) as resp:
+            if resp.status_code != 206:
+                raise IOError(f"Server ignored range request (HTTP {resp.status_code})")
+            pos = lo
+            async for chunk in resp.aiter_bytes(RANGE_READ_SIZE):
+                _write_at(fd, chunk, pos)
+                pos += len(chunk)
+                downloaded += len(chunk)
+                if progress_hook:
+                    speed = downloaded / max(time.monotonic() - start, 1e-3)
+                    progress_hook({
+                        "status": "downloading",
+                        "downloaded_bytes": downloaded,
+                        "total_bytes": size,
+                        "speed": speed,
+                        "eta": (size - downloaded) / speed,
+                    })
+            if pos != hi + 1:
+                raise IOError(f"Range {lo}-{hi} ended early at byte {pos}")
+
+    start = time.monotonic()
+    # preallocate so every range can be written in place as it arrives
+    fd = os.open(out, os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    tasks = []
+    try:
+        os.ftruncate(fd, size)
+        tasks = [asyncio.ensure_future(fetch(fd, lo, hi)) for lo, hi in ranges]
+        await asyncio.gather(*tasks)
+    finally:
+        # if one range failed the others are still writing; stop them before
+        # the fd is closed (and its number possibly reused)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        os.close(fd)
+
+async def _fetch_with_ranges(url, out, headers, progress_hook):
+    async with _range_client() as client:
+        size = await probe_range_size(client, url, headers)
+        if not size:
+            return False
+        await download_ranges(client, url, size, out, headers=headers, progress_hook=progress_hook)
+    return True
+
+def _range_fetch_file(url, headers, out, progress_hook):
+    """Fetch `url` into `out` with parallel range requests; False if that didn't work."""
+    import asyncio
+    from yt_dlp.utils import DownloadCancelled
+
+    # Not ".part": the file is pre-sized with holes until every range is in,
+    # and yt-dlp would try to resume a ".part" of that size.
+    tmp = out + ".ranges"
+    ok = False
+    try:
+        ok = asyncio.run(_fetch_with_ranges(url, tmp, headers, progress_hook))
+    except DownloadCancelled:
+        raise
+    except Exception as e:
+        print("Parallel download failed, retrying with yt-dlp:", e)
+    finally:
+        # runs on every exit (cancel, Ctrl-C, errors): never leave a holed file
+        if ok:
+            os.replace(tmp, out)
+        elif os.path.exists(tmp):
+            os.remove(tmp)
+    return ok
+
+def try_range_download(dl, info, progress_hook=None):
+    """Pre-fetch the selected format(s) of `info` with parallel range requests.
+
+    Files are written where yt-dlp expects them, so a following
+    `dl.process_ie_result(info, download=True)` skips those downloads and
+    only merges/post-processes. Separate video+audio formats (Bilibili's
+    usual DASH streams) are fetched one after the other. Returns False when
+    nothing was fetched: playlists, DASH/HLS manifests, or servers without
+    range support are left to yt-dlp.
     """
+    if info.get("_type", "video") != "video":
+        return False
+    if os.path.exists(dl.prepare_filename(info)):
+        return False
+
+    temp = dl.prepare_filename(info, "temp")
+    if info.get("requested_formats"):
+        # yt-dlp downloads each part to <name>.f<format_id>.<ext>, then merges
+        base = os.path.splitext(temp)[0]
+        targets = [(f, f"{base}.f{f['format_id']}.{f['ext']}") for f in info["requested_formats"]]
+    else:
+        targets = [(info, temp)]
+
+    fetched = False
+    for f, out in targets:
+        if f.get("protocol") not in ("http", "https") or not f.get("url") or os.path.exists(out):
+            continue
+        if _range_fetch_file(f["url"], f.get("http_headers"), out, progress_hook):
+            fetched = True
+    return fetched
+
+def format_speed(speed):
+    """Format a bytes/second value like yt-dlp does ("1.23MiB/s")."""
+    if not speed:
+        return ""
+    for unit in ("B", "KiB", "MiB"):
+        if speed < 1024:
+            return f"{speed:.2f}{unit}/s"
+        speed /= 1024
+    return f"{speed:.2f}GiB/s"
+
+def format_eta(eta):
+    """Format an ETA in seconds as MM:SS or HH:MM:SS."""
+    if eta is None:
+        return ""
+    minutes, seconds = divmod(int(eta), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+def build_ytdl_opts(outtmpl, audio_only):
+    """Return the YoutubeDL options used for every download."""
     ytdl_opts = {
         "outtmpl": outtmpl,
         "noplaylist": False,
@@ -48,6 +245,12 @@ def run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=Non
 
     # cookies support removed; simplifies UI and CLI
 
+    # aria2c keeps many segment requests in flight per manifest instead of
+    # fetching DASH/HLS fragments back to back, one round trip each
+    if shutil.which("aria2c"):
+        ytdl_opts["external_downloader"] = {"dash": "aria2c", "m3u8": "aria2c"}
+        ytdl_opts["external_downloader_args"] = {"aria2c": ARIA2C_ARGS}
+
     if audio_only:
         ytdl_opts.update({
             "format": "bestaudio/best",
@@ -57,22 +260,125 @@ def run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=Non
         # prefer merged best video+audio, but allow fallback to separate downloads for speed
         # this format string prioritizes formats that are already muxed or easier to merge
         ytdl_opts["format"] = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best"
+    return ytdl_opts
+
+# extract_info() results for single videos are kept on disk until the
+# download succeeds, so a retry skips fetching and parsing the video page again. Bilibili media URLs
+# expire after a while, so older entries are ignored.
+def _user_cache_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "bbl-dl")
+
+INFO_CACHE_DIR = os.path.join(_user_cache_dir(), "info")
+INFO_CACHE_TTL = 30 * 60
+
+def _info_cache_path(dl, url):
+    # the format is part of the key: the cached info carries the selected format
+    key = f"{dl.params.get('format')}\n{url}"
+    return os.path.join(INFO_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+def load_cached_info(dl, url):
+    """Return the cached info dict for `url`, or None if missing or stale."""
+    path = _info_cache_path(dl, url)
+    try:
+        if time.time() - os.path.getmtime(path) > INFO_CACHE_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_cached_info(dl, url, info):
+    """Store `info` for `url`; failures only cost the cache."""
+    try:
+        os.makedirs(INFO_CACHE_DIR, exist_ok=True)
+        with open(_info_cache_path(dl, url), "w", encoding="utf-8") as f:
+            json.dump(dl.sanitize_info(info), f)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def drop_cached_info(dl, url):
+    try:
+        os.remove(_info_cache_path(dl, url))
+    except OSError:
+        pass
+
+# One YoutubeDL per audio_only setting: creating one registers every
+# extractor, so repeated downloads reuse it. It is replaced when the output
+# template changes, so switching folders doesn't leave instances open.
+_YTDL_CACHE = {}  # audio_only -> (outtmpl, YoutubeDL, hook_slot)
+_YTDL_LOCKS = {False: threading.Lock(), True: threading.Lock()}
+
+def get_ytdl(ytdl, outtmpl, audio_only):
+    """Return a cached (YoutubeDL, hook_slot) for these options.
+
+    Call with `_YTDL_LOCKS[audio_only]` held and keep holding it while the
+    instance is in use. Its only progress hook forwards to `hook_slot[0]`, so
+    each download can install its own.
+    """
+    entry = _YTDL_CACHE.get(audio_only)
+    if entry is not None:
+        if entry[0] == outtmpl:
+            return entry[1], entry[2]
+        entry[1].close()
+    hook_slot = [None]
+    ytdl_opts = build_ytdl_opts(outtmpl, audio_only)
+    ytdl_opts["progress_hooks"] = [lambda d: hook_slot[0] and hook_slot[0](d)]
+    dl = ytdl.YoutubeDL(ytdl_opts)
+    _YTDL_CACHE[audio_only] = (outtmpl, dl, hook_slot)
+    return dl, hook_slot
+
+def close_ytdl_cache():
+    """Close cached YoutubeDL instances (saves cookies, closes connections).
+
+    Instances still in use by a download are left alone.
+    """
+    for audio_only, lock in _YTDL_LOCKS.items():
+        if not lock.acquire(blocking=False):
+            continue
+        try:
+            entry = _YTDL_CACHE.pop(audio_only, None)
+            if entry is not None:
+                entry[1].close()
+        finally:
+            lock.release()
 
+def parse_urls(text):
+    """Split `text` into URLs, one per line, skipping blanks and '#' comments."""
+    return [line.strip() for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")]
+
+def run_with_yt_dlp_module(ytdl, urls, outtmpl, audio_only, progress_callback=None, cancel_event=None):
+    """Run download of one or more `urls` using yt-dlp module.
+
+    All URLs go through one YoutubeDL instance, so extractor state, cookies
+    and HTTP connections are shared across the batch.
+
+    If `progress_callback` is provided it will be called as:
+        progress_callback(percent_float_or_None, speed_str, eta_str)
+    where percent_float_or_None is a float in range [0,100] or None when not available.
+
+    If `cancel_event` (a threading.Event) gets set, the download stops at the
+    next progress update and 4 is returned.
+    """
     def progress_hook(d):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ytdl.utils.DownloadCancelled("Download cancelled")
         status = d.get("status")
         if status == "downloading":
-            perc_raw = d.get("_percent_str", "").strip()
-            speed = d.get("_speed_str", "").strip()
-            eta = d.get("_eta_str", "").strip()
-            # try to parse percentage like '12.3%'
-            percent = None
-            try:
-                if perc_raw.endswith("%"):
-                    percent = float(perc_raw.strip().replace("%", ""))
-                else:
-                    percent = float(perc_raw)
-            except Exception:
-                percent = None
+            # yt-dlp reports raw byte counts; no need to parse its display strings
+            db = d.get("downloaded_bytes")
+            tb = d.get("total_bytes") or d.get("total_bytes_estimate")
+            percent = (100.0 * db / tb) if (db and tb) else None
+            if percent is None:
+                # some downloaders only report the display string, e.g. ' 12.3%'
+                m = _PCT_RE.search(d.get("_percent_str") or "")
+                percent = float(m.group(1)) if m else None
+            speed = format_speed(d.get("speed"))
+            eta = format_eta(d.get("eta"))
             # call optional callback for GUI updates
             if progress_callback:
                 try:
@@ -81,7 +387,8 @@ def run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=Non
                     pass
             else:
                 # fallback: print to console
-                print(f"\rDownloading: {perc_raw} at {speed} ETA {eta}", end="", flush=True)
+                perc = f"{percent:.1f}%" if percent is not None else "?%"
+                print(f"\rDownloading: {perc} at {speed} ETA {eta}", end="", flush=True)
         elif status == "finished":
             if progress_callback:
                 try:
@@ -91,12 +398,41 @@ def run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=Non
             else:
                 print("\nDownload finished, post-processing...")
 
-    ytdl_opts["progress_hooks"] = [progress_hook]
-
-    with ytdl.YoutubeDL(ytdl_opts) as dl:
+    with _YTDL_LOCKS[audio_only]:
+        dl, hook_slot = get_ytdl(ytdl, outtmpl, audio_only)
+        hook_slot[0] = progress_hook
         try:
-            dl.download([url])
+            use_ranges = try_import_httpx() is not None
+            for url in urls:
+                info = load_cached_info(dl, url)
+                cached = info is not None
+                if not cached:
+                    ie_result = dl.extract_info(url, download=False, process=False)
+                    if ie_result.get("_type", "video") != "video":
+                        # playlists and multi-part videos: yt-dlp extracts each
+                        # entry right before downloading it, so its time-limited
+                        # media URLs are still fresh; nothing is cached
+                        dl.process_ie_result(ie_result, download=True)
+                        continue
+                    info = dl.process_ie_result(ie_result, download=False)
+                    save_cached_info(dl, url, info)
+                try:
+                    if use_ranges:
+                        try_range_download(dl, info, progress_hook)
+                    dl.process_ie_result(info, download=True)
+                except ytdl.utils.DownloadCancelled:
+                    # keep the cache: retrying after a cancel is what it's for
+                    raise
+                except Exception:
+                    if cached:
+                        # its media URLs may have expired; extract afresh next time
+                        drop_cached_info(dl, url)
+                    raise
+                drop_cached_info(dl, url)
             print("Done.")
+        except ytdl.utils.DownloadCancelled:
+            print("\nDownload cancelled.")
+            return 4
         except Exception as e:
             error_msg = str(e)
             if "ffmpeg" in error_msg.lower():
@@ -109,17 +445,43 @@ def run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=Non
             else:
                 print("Error while downloading:", e)
                 return 1
+        finally:
+            hook_slot[0] = None
     return 0
 
-def run_with_cli(url, outdir, audio_only):
-    cmd = ["yt-dlp", url, "-o", os.path.join(outdir, "%(title)s.%(ext)s")]
+def run_with_cli(urls, outdir, audio_only, quiet=False, cancel_event=None):
+    """Run the yt-dlp executable; its output goes straight to our stdout/stderr.
+
+    With `quiet` (used by the GUI, which has nowhere to show it) progress
+    output is turned off and stdout is discarded; errors still reach stderr.
+    If `cancel_event` gets set, yt-dlp is terminated and 4 is returned.
+    """
+    cmd = ["yt-dlp", "-o", os.path.join(outdir, OUTPUT_TEMPLATE)]
     if audio_only:
         cmd += ["-x", "--audio-format", "mp3"]
+    if quiet:
+        cmd += ["--no-progress"]
+    # "--" so a batch-file line starting with "-" can't be read as an option
+    cmd += ["--", *urls]
     print("Falling back to yt-dlp CLI. Running:", " ".join(cmd))
-    return subprocess.call(cmd)
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL if quiet else None)
+    while True:
+        try:
+            return proc.wait(timeout=None if cancel_event is None else 0.2)
+        except subprocess.TimeoutExpired:
+            if cancel_event.is_set():
+                proc.terminate()
+                proc.wait()
+                return 4
+
+# Status box is trimmed to half this many lines once it grows past it.
+STATUS_MAX_LINES = 200
 
 class BiliDownloaderGUI:
     def __init__(self, root):
+        import tkinter as tk
+        from concurrent.futures import ThreadPoolExecutor
+
         self.root = root
         self.root.title("✨ Bilibili Downloader ✨")
         
@@ -136,9 +498,19 @@ class BiliDownloaderGUI:
             except Exception:
                 pass
 
-        self.root.geometry("550x520")
+        self.root.geometry("550x600")
         self.root.config(bg="#f8f8f8")
         self.downloading = False
+        # latest (percent, speed, eta) waiting to be drawn, see _progress_callback
+        self._pending = None
+        self._scheduled = False
+        # output folder already created by the previous download, and its template
+        self._last_outdir = None
+        self._outtmpl = None
+        # downloads run on pooled workers; _cancel stops the current one
+        self._pool = ThreadPoolExecutor(max_workers=4)
+        self._fut = None
+        self._cancel = threading.Event()
         
         # Color palette
         self.color_primary = "#de3e28"
@@ -156,13 +528,13 @@ class BiliDownloaderGUI:
         title.pack(pady=(0, 15), anchor="w")
         
         # URL Label and Entry
-        url_label = tk.Label(main_frame, text="📺 Video URL:", font=("Segoe UI", 10, "bold"), 
+        url_label = tk.Label(main_frame, text="📺 Video URL(s), one per line:", font=("Segoe UI", 10, "bold"), 
                             bg=self.color_bg, fg=self.color_text)
         url_label.pack(pady=(10, 3), anchor="w")
-        self.url_entry = tk.Entry(main_frame, font=("Segoe UI", 10), relief="flat", 
-                                  bd=2, bg="white", fg=self.color_text,
-                                  highlightthickness=1, highlightbackground="red", highlightcolor="red")
-        self.url_entry.pack(pady=(0, 10), fill="x")
+        self.url_text = tk.Text(main_frame, height=3, font=("Segoe UI", 10), relief="flat",
+                                bd=2, bg="white", fg=self.color_text,
+                                highlightthickness=1, highlightbackground="red", highlightcolor="red")
+        self.url_text.pack(pady=(0, 10), fill="x")
         
         # Output Directory
         dir_label = tk.Label(main_frame, text="📁 Output Folder:", font=("Segoe UI", 10, "bold"),
@@ -209,7 +581,10 @@ class BiliDownloaderGUI:
         self.progress_bar.pack(side="left", fill="x", expand=True)
         self.progress_bar.bind("<Configure>", self._on_progress_bar_configure)
         self.progress_bar_width = 300
-        self.progress_bar_fill = None
+        # single fill rectangle, resized with coords() on every update
+        self.progress_bar_fill = self.progress_bar.create_rectangle(0, 0, 0, 8, fill=self.color_accent, outline="")
+        self.progress_percent = 0.0
+        self._resize_job = None
         self.percent_label = tk.Label(self.progress_frame, text="0%", width=5,
                                      font=("Segoe UI", 9, "bold"), bg=self.color_bg,
                                      fg=self.color_primary)
@@ -221,8 +596,16 @@ class BiliDownloaderGUI:
                                      relief="flat", bd=0, padx=20, pady=12, cursor="hand2",
                                      activebackground=self.color_primary, activeforeground="white")
         self.download_btn.pack(pady=(10, 0), fill="x")
+        self.cancel_btn = tk.Button(main_frame, text="✖ Cancel", command=self.cancel_download,
+                                   bg=self.color_bg, fg=self.color_primary, font=("Segoe UI", 9, "bold"),
+                                   relief="flat", bd=0, pady=6, cursor="hand2", state="disabled",
+                                   activebackground=self.color_bg, activeforeground=self.color_accent)
+        self.cancel_btn.pack(pady=(6, 0), fill="x")
     
     def browse_directory(self):
+        import tkinter as tk
+        from tkinter import filedialog
+
         folder = filedialog.askdirectory()
         if folder:
             self.dir_entry.delete(0, tk.END)
@@ -233,135 +616,248 @@ class BiliDownloaderGUI:
         return
     
     def _on_progress_bar_configure(self, event):
-        """Update progress bar width on canvas resize."""
+        """Update progress bar width on canvas resize.
+
+        Window drags fire many events; the fill is redrawn once they settle.
+        """
         self.progress_bar_width = event.width
+        if self._resize_job is not None:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(50, self._on_resize_settled)
+
+    def _on_resize_settled(self):
+        self._resize_job = None
+        self._redraw_fill()
+
+    def _redraw_fill(self):
+        fill_width = (self.progress_percent / 100.0) * max(self.progress_bar_width, 0)
+        self.progress_bar.coords(self.progress_bar_fill, 0, 0, fill_width, 8)
     
     def log_status(self, message):
+        """Append a line to the status box; safe to call from worker threads."""
+        if threading.current_thread() is threading.main_thread():
+            self._append_status(message)
+        else:
+            self._call_in_gui(self._append_status, message)
+
+    def _call_in_gui(self, func, *args):
+        """Run `func(*args)` on the Tk thread; dropped if the window is gone."""
+        try:
+            self.root.after(0, func, *args)
+        except Exception:
+            pass
+
+    def _show_message(self, kind, title, message):
+        """Show a messagebox (`kind` e.g. "showerror") from any thread."""
+        from tkinter import messagebox
+
+        self._call_in_gui(getattr(messagebox, kind), title, message)
+
+    def _append_status(self, message):
+        import tkinter as tk
+
         self.status_text.config(state="normal")
         self.status_text.insert(tk.END, message + "\n")
+        # keep the widget bounded on long sessions
+        lines = int(self.status_text.index("end-1c").split(".")[0])
+        if lines > STATUS_MAX_LINES:
+            self.status_text.delete("1.0", f"{lines - STATUS_MAX_LINES // 2}.0")
         self.status_text.see(tk.END)
         self.status_text.config(state="disabled")
-        self.root.update()
+        self.root.update_idletasks()
     
     def download(self):
-        url = self.url_entry.get().strip()
+        import tkinter as tk
+        from tkinter import messagebox
+
+        urls = parse_urls(self.url_text.get("1.0", tk.END))
         outdir = self.dir_entry.get().strip()
         audio_only = self.audio_only_var.get()
         
-        if not url:
+        if not urls:
             messagebox.showerror("Error", "Please enter a Bilibili URL")
             return
         
         self.downloading = True
         self.download_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
         self.status_text.config(state="normal")
         self.status_text.delete(1.0, tk.END)
         self.status_text.config(state="disabled")
         
-        thread = threading.Thread(target=self._download_thread, args=(url, outdir, audio_only))
-        thread.daemon = True
-        thread.start()
+        self._cancel.clear()
+        self._fut = self._pool.submit(self._download_thread, urls, outdir, audio_only)
+
+    def cancel_download(self):
+        """Stop the current download at its next progress update."""
+        self._cancel.set()
+        self.cancel_btn.config(state="disabled")
+        if self._fut is not None and self._fut.cancel():
+            # never started, so _download_thread won't reset the buttons
+            self._download_finished()
+        self.log_status("Cancelling...")
+
+    def _download_finished(self):
+        self.downloading = False
+        self.download_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+
+    def close(self, timeout=None):
+        """Cancel any running download and release the worker pool.
+
+        Returns False if the download is still running after `timeout`
+        seconds (cancel is only noticed at progress updates, so extraction
+        or an ffmpeg merge can't be interrupted).
+        """
+        from concurrent.futures import wait
+
+        self._cancel.set()
+        self._pool.shutdown(wait=False)
+        if self._fut is None:
+            return True
+        return not wait([self._fut], timeout=timeout).not_done
 
     def _progress_callback(self, percent, speed, eta):
-        """Thread-safe progress update called from yt-dlp progress hook."""
-        def _update():
-            if percent is not None:
-                # clamp
-                try:
-                    p = max(0.0, min(100.0, float(percent)))
-                except Exception:
-                    p = 0.0
-                # update canvas-based progress bar
-                self.progress_bar.delete("fill")
-                if self.progress_bar_width > 0:
-                    fill_width = (p / 100.0) * self.progress_bar_width
-                    self.progress_bar.create_rectangle(0, 0, fill_width, 8, fill=self.color_accent, outline="")
-                self.percent_label.config(text=f"{p:.0f}%")
-                self.progress_status.config(text=f"🔄 {p:.0f}%   {speed}   {eta}", fg=self.color_accent)
-            else:
-                # unknown percent - show speed/eta only
-                status = []
-                if speed:
-                    status.append(speed)
-                if eta:
-                    status.append(eta)
-                self.progress_status.config(text="🔄 " + " ".join(status) or "Downloading...", fg=self.color_accent)
-        try:
-            self.root.after(0, _update)
-        except Exception:
-            pass
+        """Thread-safe progress update called from yt-dlp progress hook.
+
+        yt-dlp can report progress dozens of times per second; only the
+        latest values are kept and the GUI is redrawn at most ~30 times a second.
+        """
+        self._pending = (percent, speed, eta)
+        if not self._scheduled:
+            self._scheduled = True
+            try:
+                self.root.after(33, self._flush_progress)
+            except Exception:
+                self._scheduled = False
+
+    def _flush_progress(self):
+        self._scheduled = False
+        percent, speed, eta = self._pending
+        if percent is not None:
+            # clamp
+            try:
+                p = max(0.0, min(100.0, float(percent)))
+            except Exception:
+                p = 0.0
+            # update canvas-based progress bar
+            self.progress_percent = p
+            self._redraw_fill()
+            self.percent_label.config(text=f"{p:.0f}%")
+            self.progress_status.config(text=f"🔄 {p:.0f}%   {speed}   {eta}", fg=self.color_accent)
+        else:
+            # unknown percent - show speed/eta only
+            status = []
+            if speed:
+                status.append(speed)
+            if eta:
+                status.append(eta)
+            self.progress_status.config(text="🔄 " + " ".join(status) or "Downloading...", fg=self.color_accent)
     
-    def _download_thread(self, url, outdir, audio_only):
+    def _download_thread(self, urls, outdir, audio_only):
+        # runs on a pool worker: every Tk call goes through log_status or
+        # _show_message/_call_in_gui, which hand it to the Tk thread
         try:
-            os.makedirs(outdir, exist_ok=True)
-            outtmpl = os.path.join(outdir, "%(title)s.%(ext)s")
+            # only hit the filesystem when the output folder changes
+            if outdir != self._last_outdir:
+                os.makedirs(outdir, exist_ok=True)
+                self._last_outdir = outdir
+                self._outtmpl = os.path.join(outdir, OUTPUT_TEMPLATE)
+            outtmpl = self._outtmpl
             
             ytdl = try_import_yt_dlp()
             if ytdl is not None:
-                exit_code = run_with_yt_dlp_module(ytdl, url, outtmpl, audio_only, progress_callback=self._progress_callback)
+                exit_code = run_with_yt_dlp_module(ytdl, urls, outtmpl, audio_only,
+                                                   progress_callback=self._progress_callback,
+                                                   cancel_event=self._cancel)
                 if exit_code == 0:
                     self.log_status("Download completed successfully!")
-                    messagebox.showinfo("Success", "Download completed!")
+                    self._show_message("showinfo", "Success", "Download completed!")
+                elif exit_code == 4:
+                    self.log_status("Download cancelled.")
                 elif exit_code == 3:
                     self.log_status("FFmpeg is not installed. Install it to download videos.")
-                    messagebox.showerror("FFmpeg Missing", "FFmpeg is required to download videos.\n\nInstall it from: https://ffmpeg.org/download.html")
+                    self._show_message("showerror", "FFmpeg Missing", "FFmpeg is required to download videos.\n\nInstall it from: https://ffmpeg.org/download.html")
                 else:
                     self.log_status("Download failed with error code: " + str(exit_code))
-                    messagebox.showerror("Error", "Download failed")
+                    self._show_message("showerror", "Error", "Download failed")
             else:
                 self.log_status("Falling back to yt-dlp CLI...")
-                rc = run_with_cli(url, outdir, audio_only)
+                rc = run_with_cli(urls, outdir, audio_only, quiet=True, cancel_event=self._cancel)
                 if rc == 0:
                     self.log_status("Download completed successfully!")
-                    messagebox.showinfo("Success", "Download completed!")
+                    self._show_message("showinfo", "Success", "Download completed!")
+                elif rc == 4:
+                    self.log_status("Download cancelled.")
                 else:
                     self.log_status("Download failed")
-                    messagebox.showerror("Error", "Download failed")
+                    self._show_message("showerror", "Error", "Download failed")
         except Exception as e:
             error_msg = str(e)
             if "ffmpeg" in error_msg.lower():
                 self.log_status("FFmpeg not found")
-                messagebox.showerror("Error", "FFmpeg is required to download videos.\n\nInstall from: https://ffmpeg.org/download.html")
+                self._show_message("showerror", "Error", "FFmpeg is required to download videos.\n\nInstall from: https://ffmpeg.org/download.html")
             else:
                 self.log_status(f"Error: {error_msg}")
-                messagebox.showerror("Error", f"An error occurred: {error_msg}")
+                self._show_message("showerror", "Error", f"An error occurred: {error_msg}")
         finally:
-            self.downloading = False
-            self.download_btn.config(state="normal")
+            self._call_in_gui(self._download_finished)
 
 def run_gui():
+    import tkinter as tk
+
     root = tk.Tk()
     app = BiliDownloaderGUI(root)
     root.mainloop()
+    if not app.close(timeout=5):
+        # the download is past the point cancel can reach (extraction, ffmpeg
+        # merge, aria2c); pool workers aren't daemon threads and would keep
+        # the process alive with no window, so leave without waiting
+        sys.stdout.flush()
+        os._exit(0)
+    close_ytdl_cache()
 
 def main():
     parser = argparse.ArgumentParser(description="Download Bilibili videos (uses yt-dlp).")
     parser.add_argument("url", nargs="?", help="Bilibili video or page URL")
     parser.add_argument("--output", "-o", default=".", help="Output directory (default: current dir)")
     parser.add_argument("--audio-only", "-a", action="store_true", help="Download audio only (mp3)")
+    parser.add_argument("--batch-file", "-b", metavar="FILE",
+                        help="File with one URL per line, downloaded in a single batch ('#' starts a comment)")
     parser.add_argument("--gui", "-g", action="store_true", help="Launch GUI instead of CLI")
     args = parser.parse_args()
+
+    urls = [args.url] if args.url else []
+    if args.batch_file:
+        try:
+            with open(args.batch_file, encoding="utf-8") as f:
+                batch = parse_urls(f.read())
+        except OSError as e:
+            parser.error(f"cannot read batch file: {e}")
+        if not batch:
+            parser.error("no URLs in batch file")
+        urls += batch
     
     # Launch GUI if requested or no URL provided
-    if args.gui or not args.url:
+    if args.gui or not urls:
         run_gui()
         return
 
-    url = args.url
     outdir = os.path.abspath(args.output)
     os.makedirs(outdir, exist_ok=True)
-    outtmpl = os.path.join(outdir, "%(title)s.%(ext)s")
+    outtmpl = os.path.join(outdir, OUTPUT_TEMPLATE)
 
     ytdl = try_import_yt_dlp()
     if ytdl is not None:
-        exit_code = run_with_yt_dlp_module(ytdl, url, outtmpl, args.audio_only)
+        exit_code = run_with_yt_dlp_module(ytdl, urls, outtmpl, args.audio_only)
+        close_ytdl_cache()
         sys.exit(exit_code)
     else:
         # try to find yt-dlp binary
         if shutil.which("yt-dlp") is None:
             print("yt-dlp not found. Install with: pip install yt-dlp")
             sys.exit(2)
-        rc = run_with_cli(url, outdir, args.audio_only)
+        rc = run_with_cli(urls, outdir, args.audio_only)
         sys.exit(rc)
 
 if __name__ == "__main__":
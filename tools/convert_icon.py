@@ -1,13 +1,35 @@
-from PIL import Image
 import sys
 
 src = r"c:\Users\My PC\Desktop\pypy\hakiri.jpeg"
 dst = r"c:\Users\My PC\Desktop\pypy\hakiri.ico"
 
-# Open and convert
-im = Image.open(src).convert('RGBA')
-# Create sizes list for .ico (Windows requires several sizes)
-sizes = [(256,256),(128,128),(64,64),(48,48),(32,32),(16,16)]
-# Resize and save as .ico
-im.save(dst, sizes=sizes)
-print('Saved', dst)
+
+def main():
+    # Pillow-SIMD (pip install pillow-simd) is a drop-in replacement with a
+    # much faster resampler, if you convert icons often
+    from PIL import Image, ImageOps
+
+    # Open and convert
+    im = Image.open(src).convert('RGBA')
+    # Create sizes list for .ico (Windows requires several sizes)
+    sizes = [(256,256),(128,128),(64,64),(48,48),(32,32),(16,16)]
+    # Resize the full-size source only once, to the biggest icon (fitted
+    # and padded with transparency, so non-square photos aren't stretched);
+    # every smaller level comes from an already-built one. Exact halvings use
+    # reduce(), Pillow's 2x2 box filter in C, so 32x32 comes from 64x64
+    # rather than 48x48; 48x48 is resampled from the next larger level.
+    levels = {sizes[0]: ImageOps.pad(im, sizes[0], method=Image.LANCZOS, color=(0, 0, 0, 0))}
+    for size in sizes[1:]:
+        half = levels.get((2 * size[0], 2 * size[1]))
+        if half is not None:
+            levels[size] = half.reduce(2)
+        else:
+            larger = min((s for s in levels if s[0] > size[0]), key=lambda s: s[0])
+            levels[size] = levels[larger].resize(size, Image.LANCZOS)
+    images = [levels[size] for size in sizes]
+    images[0].save(dst, format="ICO", sizes=sizes, append_images=images[1:])
+    print('Saved', dst)
+
+
+if __name__ == "__main__":
+    main()